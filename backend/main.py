@@ -2,9 +2,12 @@
 FastAPI backend for AI Weather & Solar Predictor.
 Main application entry point.
 """
+import asyncio
 import logging
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+import numpy as np
 import pandas as pd
 from typing import Dict, List
 
@@ -13,8 +16,10 @@ from schemas import LocationRequest, DataResponse, LocationMetadata, TimeSeriesP
 from services.geocode import geocode_location
 from services.reverse_geocode import reverse_geocode
 from services.geocode_autocomplete import get_autocomplete_suggestions
+from services.popular_cities import search_popular_cities
 from services.weather import fetch_historical, fetch_forecast, extract_current_from_forecast
-from services.ml import train_local_model, forecast_with_model, blend_ml_and_api
+from services.ml import train_local_model, forecast_with_model
+from services.cache import TTLCache, make_key
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,7 +28,10 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="AI Weather & Solar Predictor API",
     description="Historical, real-time and AI-enhanced forecasts for any exact location.",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson serializes the large time-series payloads several times faster
+    # than the stdlib json path and handles numpy scalars natively
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware to allow frontend requests
@@ -69,12 +77,22 @@ async def autocomplete_location(q: str):
         return AutocompleteResponse(suggestions=[])
     
     try:
-        suggestions_data = get_autocomplete_suggestions(
-            q.strip(),
-            limit=8,
-            google_api_key=GOOGLE_MAPS_API_KEY
-        )
-        
+        # Local prefix index first - popular cities resolve with zero
+        # network I/O, which covers most keystroke-driven queries
+        suggestions_data = search_popular_cities(q.strip(), limit=8)
+
+        if len(suggestions_data) < 8:
+            http_suggestions = get_autocomplete_suggestions(
+                q.strip(),
+                limit=8 - len(suggestions_data),
+                google_api_key=GOOGLE_MAPS_API_KEY
+            )
+            # Keep local hits first, drop HTTP duplicates of the same place
+            seen = {(round(s["latitude"], 3), round(s["longitude"], 3)) for s in suggestions_data}
+            for s in http_suggestions:
+                if (round(s["latitude"], 3), round(s["longitude"], 3)) not in seen:
+                    suggestions_data.append(s)
+
         suggestions = [
             AutocompleteSuggestion(
                 display_name=s["display_name"],
@@ -93,33 +111,72 @@ async def autocomplete_location(q: str):
         return AutocompleteResponse(suggestions=[])
 
 
-def dataframe_to_timeseries(df: pd.DataFrame) -> List[TimeSeriesPoint]:
+# Columns expected by TimeSeriesPoint (besides 'time')
+TIMESERIES_COLUMNS = ["temperature_2m", "relativehumidity_2m", "shortwave_radiation",
+                      "cloudcover", "precipitation", "pressure_msl", "wind_speed_10m"]
+
+
+def dataframe_to_timeseries(df: pd.DataFrame, overrides: Dict[str, np.ndarray] = None) -> List[TimeSeriesPoint]:
     """
     Convert a DataFrame with 'time' and weather columns to List[TimeSeriesPoint].
+
+    Works on raw numpy column views: ISO time strings come from one
+    np.datetime_as_string call, null checks from precomputed isnan masks -
+    no intermediate frame, no per-cell pandas machinery.
+
+    `overrides` substitutes per-column value arrays (e.g. ML or blended
+    forecasts) without cloning the whole frame first.
     """
     if df.empty:
         return []
 
-    points = []
-    for _, row in df.iterrows():
-        point = TimeSeriesPoint(
-            time=row["time"].isoformat() if pd.notna(row["time"]) else "",
-            temperature_2m=float(row["temperature_2m"]) if pd.notna(row.get("temperature_2m")) else None,
-            relativehumidity_2m=float(row["relativehumidity_2m"]) if pd.notna(row.get("relativehumidity_2m")) else None,
-            shortwave_radiation=float(row["shortwave_radiation"]) if pd.notna(row.get("shortwave_radiation")) else None,
-            cloudcover=float(row["cloudcover"]) if pd.notna(row.get("cloudcover")) else None,
-            precipitation=float(row["precipitation"]) if pd.notna(row.get("precipitation")) else None,
-            pressure_msl=float(row["pressure_msl"]) if pd.notna(row.get("pressure_msl")) else None,
-            wind_speed_10m=float(row["wind_speed_10m"]) if pd.notna(row.get("wind_speed_10m")) else None,
+    time_values = df["time"].to_numpy(dtype="datetime64[s]")
+    times = np.datetime_as_string(time_values, timezone="UTC")
+    nat_mask = np.isnat(time_values)
+    if nat_mask.any():
+        times[nat_mask] = ""
+
+    overrides = overrides or {}
+    available = [col for col in TIMESERIES_COLUMNS if col in df.columns]
+    arrays = {col: (np.asarray(overrides[col], dtype="float64") if col in overrides
+                    else df[col].to_numpy(dtype="float64", na_value=np.nan))
+              for col in available}
+    masks = {col: np.isnan(arrays[col]) for col in available}
+
+    # model_construct skips per-field validation - the values come from
+    # typed columns we just normalized, so re-validating them is pure overhead
+    points = [None] * len(df)
+    for i in range(len(df)):
+        points[i] = TimeSeriesPoint.model_construct(
+            time=times[i],
+            **{col: (None if masks[col][i] else float(arrays[col][i])) for col in available}
         )
-        points.append(point)
-
     return points
 
 
-def create_ml_forecast_df(historical_df: pd.DataFrame, forecast_df: pd.DataFrame, target_column: str) -> pd.DataFrame:
+# Training is the heaviest CPU step per request - cache models for an hour,
+# keyed on rounded coordinates, variable and newest historical timestamp
+# (the timestamp in the key invalidates entries when new data arrives)
+_model_cache = TTLCache("ml_models", ttl=3600, maxsize=256)
+
+
+def downcast_weather_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcast weather columns to float32. Halving the element size halves
+    memory traffic through ML training, blending and response construction;
+    the precision is far beyond sensor accuracy anyway.
+    """
+    for col in TIMESERIES_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+    return df
+
+
+def create_ml_forecast_df(historical_df: pd.DataFrame, forecast_df: pd.DataFrame, target_column: str,
+                          lat: float = None, lon: float = None) -> pd.DataFrame:
     """
-    Train ML model and generate forecasts for a target column.
+    Train ML model (or reuse a cached one for this location) and generate
+    forecasts for a target column.
     Returns DataFrame with 'time' and the predicted values.
     """
     if historical_df.empty or forecast_df.empty:
@@ -134,16 +191,29 @@ def create_ml_forecast_df(historical_df: pd.DataFrame, forecast_df: pd.DataFrame
         return forecast_df[["time", target_column]].copy()
 
     try:
-        # Train model
-        model, lags = train_local_model(historical_series, lags=24)
+        cache_key = None
+        if lat is not None and lon is not None:
+            cache_key = make_key(round(lat, 3), round(lon, 3), target_column,
+                                 historical_series.index.max().isoformat())
+
+        cached = _model_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            logger.info(f"Reusing cached model for {target_column}")
+            model, lags = cached
+        else:
+            # Train model
+            model, lags = train_local_model(historical_series, lags=24)
+            if cache_key:
+                _model_cache.set(cache_key, (model, lags))
 
         # Generate predictions for forecast horizon
         steps = len(forecast_df)
         predictions = forecast_with_model(model, historical_series, steps=steps, lags=lags)
 
-        # Create result DataFrame
+        # Create result DataFrame - pass the Series as-is so 'time' keeps its
+        # tz-aware datetime64 dtype instead of degrading through .values
         ml_forecast = pd.DataFrame({
-            "time": forecast_df["time"].values,
+            "time": forecast_df["time"],
             target_column: predictions
         })
 
@@ -155,7 +225,9 @@ def create_ml_forecast_df(historical_df: pd.DataFrame, forecast_df: pd.DataFrame
         return forecast_df[["time", target_column]].copy()
 
 
-@app.post("/api/data", response_model=DataResponse)
+# response_model=None skips FastAPI's re-validation of the (large) response
+# on the return path; the body is still documented via `responses`
+@app.post("/api/data", response_model=None, responses={200: {"model": DataResponse}})
 async def get_weather_data(request: LocationRequest):
     """
     Main endpoint: geocode location, fetch weather data, train ML models, and return predictions.
@@ -168,26 +240,27 @@ async def get_weather_data(request: LocationRequest):
             lon = request.longitude
             logger.info(f"Using provided coordinates: ({lat}, {lon})")
             
-            # Reverse geocode to get location name
+            # Reverse geocode to get location name; build the metadata
+            # struct directly instead of an intermediate geo_data dict
             try:
                 reverse_geo = reverse_geocode(lat, lon, google_api_key=GOOGLE_MAPS_API_KEY)
-                geo_data = {
-                    "name": reverse_geo.get("display_name") or reverse_geo.get("name"),
-                    "country": reverse_geo.get("country"),
-                    "latitude": lat,
-                    "longitude": lon,
-                    "elevation": None  # Reverse geocoding doesn't typically provide elevation
-                }
-                logger.info(f"Reverse geocoded to: {geo_data.get('name')}")
+                location_meta = LocationMetadata(
+                    resolved_name=reverse_geo.get("display_name") or reverse_geo.get("name") or f"{lat:.4f}, {lon:.4f}",
+                    country=reverse_geo.get("country"),
+                    latitude=lat,
+                    longitude=lon,
+                    elevation=None  # Reverse geocoding doesn't typically provide elevation
+                )
+                logger.info(f"Reverse geocoded to: {location_meta.resolved_name}")
             except Exception as e:
                 logger.warning(f"Reverse geocoding failed: {str(e)}, using coordinates as name")
-                geo_data = {
-                    "name": f"{lat:.4f}, {lon:.4f}",
-                    "country": None,
-                    "latitude": lat,
-                    "longitude": lon,
-                    "elevation": None
-                }
+                location_meta = LocationMetadata.model_construct(
+                    resolved_name=f"{lat:.4f}, {lon:.4f}",
+                    country=None,
+                    latitude=lat,
+                    longitude=lon,
+                    elevation=None
+                )
         elif request.location:
             # Location text provided - geocode it
             logger.info(f"Geocoding location: {request.location}")
@@ -195,90 +268,105 @@ async def get_weather_data(request: LocationRequest):
                 geo_data = geocode_location(request.location, google_api_key=GOOGLE_MAPS_API_KEY)
                 lat = geo_data["latitude"]
                 lon = geo_data["longitude"]
-                logger.info(f"Successfully geocoded to: {geo_data.get('name')} at ({lat}, {lon})")
+                location_meta = LocationMetadata(
+                    resolved_name=geo_data["name"],
+                    country=geo_data.get("country"),
+                    latitude=lat,
+                    longitude=lon,
+                    elevation=geo_data.get("elevation")
+                )
+                logger.info(f"Successfully geocoded to: {location_meta.resolved_name} at ({lat}, {lon})")
             except Exception as e:
                 logger.error(f"Geocoding failed for '{request.location}': {str(e)}")
                 raise
         else:
             raise ValueError("Either 'location' or 'latitude' and 'longitude' must be provided")
 
-        # Step 2: Fetch historical data (with fallback)
-        logger.info(f"Fetching historical data for {request.historical_days} days...")
-        try:
-            historical_df = fetch_historical(lat, lon, days=request.historical_days)
+        # Steps 2-3: Fetch historical and forecast data concurrently - two
+        # independent HTTP calls against different Open-Meteo hosts, so
+        # overlapping them halves the ingest wall time
+        logger.info(f"Fetching historical ({request.historical_days}d) and "
+                    f"forecast ({request.forecast_days}d) data...")
+        historical_result, forecast_result = await asyncio.gather(
+            asyncio.to_thread(fetch_historical, lat, lon, request.historical_days),
+            asyncio.to_thread(fetch_forecast, lat, lon, request.forecast_days),
+            return_exceptions=True,
+        )
+
+        # Historical data is optional (with fallback)
+        if isinstance(historical_result, Exception):
+            logger.warning(f"Failed to fetch historical data: {str(historical_result)}, "
+                           f"continuing with forecast only")
+            # Typed empty frame so downstream datetime/float operations never
+            # fall back to object-dtype paths
+            historical_df = pd.DataFrame({
+                "time": pd.Series(dtype="datetime64[ns, UTC]"),
+                **{col: pd.Series(dtype="float32") for col in TIMESERIES_COLUMNS}
+            })
+        else:
+            historical_df = downcast_weather_columns(historical_result)
             if historical_df.empty:
                 logger.warning("Historical data is empty, continuing with forecast only")
-        except Exception as e:
-            logger.warning(f"Failed to fetch historical data: {str(e)}, continuing with forecast only")
-            historical_df = pd.DataFrame(columns=["time", "temperature_2m", "relativehumidity_2m", 
-                                                  "shortwave_radiation", "cloudcover", "precipitation", 
-                                                  "pressure_msl", "wind_speed_10m"])
-
-        # Step 3: Fetch forecast data (required)
-        logger.info(f"Fetching forecast data for {request.forecast_days} days...")
-        forecast_df = fetch_forecast(lat, lon, days=request.forecast_days)
-        
+
+        # Forecast data is required
+        if isinstance(forecast_result, Exception):
+            raise forecast_result
+        forecast_df = downcast_weather_columns(forecast_result)
+
         if forecast_df.empty:
             raise ValueError("Failed to fetch forecast data. Please try again later.")
 
         # Step 4: Extract current conditions
         current = extract_current_from_forecast(forecast_df)
 
-        # Step 5: Train ML models and generate forecasts for each target variable
+        # Step 5: Train ML models and generate forecasts for each target variable.
+        # The three models are independent and CPU-bound (sklearn/numpy release
+        # the GIL), so train them concurrently instead of one after another.
         logger.info("Training ML models...")
         target_variables = ["temperature_2m", "shortwave_radiation", "wind_speed_10m"]
 
-        ml_forecasts = {}
-        for var in target_variables:
-            if var in historical_df.columns and var in forecast_df.columns:
-                ml_forecast_df = create_ml_forecast_df(historical_df, forecast_df, var)
-                ml_forecasts[var] = ml_forecast_df
-
-        # Step 6: Blend ML and API forecasts
+        trainable = [var for var in target_variables
+                     if var in historical_df.columns and var in forecast_df.columns]
+        results = await asyncio.gather(*[
+            asyncio.to_thread(create_ml_forecast_df, historical_df, forecast_df, var, lat=lat, lon=lon)
+            for var in trainable
+        ])
+        ml_forecasts = dict(zip(trainable, results))
+
+        # Step 6: Blend ML and API forecasts. The ML forecast was built on
+        # forecast_df["time"] in create_ml_forecast_df, so both frames share
+        # the same time axis - blend directly in numpy instead of wrapping
+        # each side in a datetime-indexed Series and realigning. The ML and
+        # blended columns are kept as plain override arrays; cloning
+        # forecast_df twice just to feed the serializer was pure copy cost.
         logger.info("Blending ML and API forecasts...")
-        blended_df = forecast_df.copy()
+        alpha = 0.6  # Higher ML weight for better accuracy based on local patterns
+        ml_overrides = {}
+        blended_overrides = {}
 
         for var in target_variables:
             if var in ml_forecasts and not ml_forecasts[var].empty:
-                ml_series = pd.Series(
-                    ml_forecasts[var][var].values,
-                    index=pd.to_datetime(ml_forecasts[var]["time"])
-                )
-                api_series = pd.Series(
-                    forecast_df[var].values,
-                    index=pd.to_datetime(forecast_df["time"])
-                )
+                ml_values = ml_forecasts[var][var].to_numpy()
+                api_values = forecast_df[var].to_numpy()
 
-                try:
-                    # Use higher ML weight (0.6) for better accuracy based on local patterns
-                    blended_series = blend_ml_and_api(ml_series, api_series, alpha=0.6)
-                    blended_df[var] = blended_series.values
-                except Exception as e:
-                    logger.warning(f"Could not blend {var}: {str(e)}, using API forecast only")
+                if len(ml_values) == len(api_values):
+                    ml_overrides[var] = ml_values
+                    blended_overrides[var] = alpha * ml_values + (1 - alpha) * api_values
+                else:
+                    logger.warning(f"Could not blend {var}: length mismatch, using API forecast only")
 
         # Step 7: Convert to response format
-        ml_forecast_combined = forecast_df.copy()
-        for var in target_variables:
-            if var in ml_forecasts and not ml_forecasts[var].empty:
-                ml_forecast_combined[var] = ml_forecasts[var][var].values
-
-        response = DataResponse(
-            location=LocationMetadata(
-                resolved_name=geo_data["name"],
-                country=geo_data.get("country"),
-                latitude=lat,
-                longitude=lon,
-                elevation=geo_data.get("elevation")
-            ),
+        response = DataResponse.model_construct(
+            location=location_meta,
             current=current,
             historical=dataframe_to_timeseries(historical_df),
             api_forecast=dataframe_to_timeseries(forecast_df),
-            ml_forecast=dataframe_to_timeseries(ml_forecast_combined),
-            blended_forecast=dataframe_to_timeseries(blended_df)
+            ml_forecast=dataframe_to_timeseries(forecast_df, overrides=ml_overrides),
+            blended_forecast=dataframe_to_timeseries(forecast_df, overrides=blended_overrides)
         )
 
         logger.info("Request completed successfully")
-        return response
+        return response.model_dump()
 
     except ValueError as e:
         error_msg = str(e)
@@ -1,7 +1,7 @@
 """
 Pydantic schemas for API request/response models.
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, model_validator
 from typing import List, Dict, Optional
 
 
@@ -11,12 +11,13 @@ class LocationRequest(BaseModel):
     longitude: Optional[float] = None
     historical_days: int = 60
     forecast_days: int = 7
-    
-    def __init__(self, **data):
-        super().__init__(**data)
+
+    @model_validator(mode="after")
+    def _require_location_or_coords(self):
         # Validate that either location or coordinates are provided
         if not self.location and (self.latitude is None or self.longitude is None):
             raise ValueError("Either 'location' or 'latitude' and 'longitude' must be provided")
+        return self
 
 
 class AutocompleteSuggestion(BaseModel):
@@ -33,6 +34,10 @@ class AutocompleteResponse(BaseModel):
 
 
 class TimeSeriesPoint(BaseModel):
+    # Instantiated thousands of times per response and never mutated -
+    # frozen lets pydantic-core skip per-instance mutation support
+    model_config = ConfigDict(frozen=True)
+
     time: str  # ISO timestamp
     temperature_2m: Optional[float] = None
     shortwave_radiation: Optional[float] = None
@@ -0,0 +1,94 @@
+"""
+Lightweight TTL caching for service results.
+In-process dict cache by default; optionally backed by Redis (set REDIS_URL)
+so multiple workers can share entries. Values cached in Redis must be
+JSON-serializable dicts/lists.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Optional Redis backend - only used if the package is installed and REDIS_URL is set
+_redis_client = None
+_REDIS_URL = os.getenv("REDIS_URL", None)
+
+if _REDIS_URL:
+    try:
+        import redis
+
+        _redis_client = redis.Redis.from_url(_REDIS_URL, socket_timeout=1)
+        _redis_client.ping()
+        logger.info("Cache using Redis backend")
+    except Exception as e:
+        logger.warning(f"Redis unavailable ({str(e)}), falling back to in-process cache")
+        _redis_client = None
+
+
+def make_key(*parts) -> str:
+    """Build a cache key from arbitrary parts (e.g. name, rounded coords)."""
+    return ":".join(str(p) for p in parts)
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with per-entry expiry and FIFO eviction.
+    When Redis is configured and `use_redis=True`, entries are mirrored there
+    (JSON-serialized) so repeat lookups hit across worker processes.
+    """
+
+    def __init__(self, name: str, ttl: float, maxsize: int = 4096, use_redis: bool = False):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.use_redis = use_redis and _redis_client is not None
+        self._data = {}  # key -> (expires_at, value); dicts preserve insertion order
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for `key`, or None if missing/expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    return value
+                del self._data[key]
+
+        if self.use_redis:
+            try:
+                raw = _redis_client.get(f"{self.name}:{key}")
+                if raw is not None:
+                    value = json.loads(raw)
+                    # Re-populate the local cache to skip Redis next time
+                    with self._lock:
+                        self._data[key] = (now + self.ttl, value)
+                    return value
+            except Exception as e:
+                logger.debug(f"Redis get failed for {self.name}:{key}: {str(e)}")
+
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store `value` under `key` for this cache's TTL."""
+        now = time.monotonic()
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                # Drop expired entries first, then the oldest-inserted ones
+                expired = [k for k, (exp, _) in self._data.items() if exp <= now]
+                for k in expired:
+                    del self._data[k]
+                while len(self._data) >= self.maxsize:
+                    self._data.pop(next(iter(self._data)))
+            self._data[key] = (now + self.ttl, value)
+
+        if self.use_redis:
+            try:
+                _redis_client.setex(f"{self.name}:{key}", int(self.ttl), json.dumps(value))
+            except Exception as e:
+                logger.debug(f"Redis set failed for {self.name}:{key}: {str(e)}")
@@ -3,14 +3,32 @@ Geocoding service using multiple APIs with fallbacks.
 Converts location text to exact coordinates, elevation, and metadata.
 Tries multiple geocoding APIs to ensure any location can be found.
 """
-import requests
+import orjson
 import logging
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Optional, List
 from urllib.parse import quote
 
+from services.cache import TTLCache, make_key
+from services.http import NOMINATIM_LIMITER, SESSION as _SESSION
+
 logger = logging.getLogger(__name__)
 
+# Shared pool for racing independent geocoding providers concurrently
+_geocode_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="geocode")
+
+# Repeat queries hit the same handful of locations, so cache resolved
+# results for 24h and skip the whole provider fallback chain
+_geocode_cache = TTLCache("geocode", ttl=24 * 3600, maxsize=4096, use_redis=True)
+
+
+def _address_country(address: Dict) -> Optional[str]:
+    """Pick a country label from a Nominatim address block, exiting early."""
+    country = address.get("country")
+    if country:
+        return country
+    return address.get("country_code")
+
 
 def _geocode_openmeteo(location_name: str) -> Optional[Dict]:
     """
@@ -25,9 +43,9 @@ def _geocode_openmeteo(location_name: str) -> Optional[Dict]:
             "language": "en"
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = _SESSION.get(url, params=params, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         results = data.get("results", [])
         if results and len(results) > 0:
@@ -69,10 +87,13 @@ def _geocode_nominatim(location_name: str) -> Optional[Dict]:
             "addressdetails": 1,
             "extratags": 1
         }
-        
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+
+        # Respect rate limit (1 request per second) without stalling callers
+        # that won't hit Nominatim again
+        NOMINATIM_LIMITER.wait()
+        response = _SESSION.get(url, params=params, headers=headers, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         if data and len(data) > 0:
             result = data[0]
@@ -81,8 +102,10 @@ def _geocode_nominatim(location_name: str) -> Optional[Dict]:
             
             if lat is not None and lon is not None:
                 address = result.get("address", {})
-                country = address.get("country") or address.get("country_code")
-                name = result.get("display_name", location_name).split(",")[0]
+                country = _address_country(address)
+                # partition() stops at the first comma instead of building
+                # the full split list
+                name = result.get("display_name", location_name).partition(",")[0]
                 
                 # Try to get elevation from the result if available
                 elevation = result.get("extratags", {}).get("elevation")
@@ -99,9 +122,6 @@ def _geocode_nominatim(location_name: str) -> Optional[Dict]:
                     "longitude": float(lon),
                     "elevation": elevation
                 }
-        
-        # Respect rate limit (1 request per second)
-        time.sleep(1)
     except Exception as e:
         logger.debug(f"Nominatim geocoding failed: {str(e)}")
     
@@ -121,9 +141,9 @@ def _geocode_geocodexyz(location_name: str) -> Optional[Dict]:
             "json": 1
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = _SESSION.get(url, params=params, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         # GeoCode.xyz returns different structure
         if data.get("latt") and data.get("longt"):
@@ -163,9 +183,9 @@ def _geocode_google_maps(location_name: str, api_key: Optional[str] = None) -> O
             "key": api_key
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = _SESSION.get(url, params=params, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         if data.get("status") != "OK" or not data.get("results"):
             return None
@@ -202,12 +222,21 @@ def _geocode_google_maps(location_name: str, api_key: Optional[str] = None) -> O
 def _try_with_variations(location_name: str) -> List[str]:
     """
     Generate location name variations to try.
+    Country suffixes only help short, bare place names ("Pune"), so the
+    fan-out is skipped for anything that already looks like a full address:
+    inputs with a comma, a digit (street/flat numbers) or more than 3 words.
     """
     variations = [location_name.strip()]
     location_clean = location_name.strip()
-    
-    # If no comma, try adding common countries
-    if "," not in location_clean:
+
+    looks_like_address = (
+        "," in location_clean
+        or any(ch.isdigit() for ch in location_clean)
+        or len(location_clean.split()) > 3
+    )
+
+    # For bare place names, try adding common countries
+    if not looks_like_address:
         variations.extend([
             f"{location_clean}, India",
             f"{location_clean}, USA",
@@ -245,10 +274,17 @@ def geocode_location(location_name: str, google_api_key: Optional[str] = None) -
         ValueError: If location not found after trying all APIs
     """
     location_clean = location_name.strip()
-    
+
     if not location_clean:
         raise ValueError("Location name cannot be empty")
-    
+
+    # Check cache first - repeat lookups skip all network calls
+    cache_key = make_key(location_clean.lower(), bool(google_api_key))
+    cached = _geocode_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Geocode cache hit for: {location_clean}")
+        return cached
+
     logger.info(f"Geocoding location: {location_clean}")
     
     # Generate variations of the location name
@@ -267,25 +303,36 @@ def geocode_location(location_name: str, google_api_key: Optional[str] = None) -
         ("GeoCode.xyz", _geocode_geocodexyz),
     ])
     
-    # Try each variation with each geocoder
+    # Try each variation, racing all geocoders concurrently - the providers
+    # are independent, so take the first one that returns a valid result
     for variation in variations:
         logger.info(f"Trying variation: {variation}")
-        
-        for geocoder_name, geocoder_func in geocoders:
-            try:
-                logger.info(f"Trying {geocoder_name} API...")
-                result = geocoder_func(variation)
-                
+
+        futures = {
+            _geocode_executor.submit(geocoder_func, variation): geocoder_name
+            for geocoder_name, geocoder_func in geocoders
+        }
+
+        try:
+            for future in as_completed(futures):
+                geocoder_name = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"{geocoder_name} API failed for '{variation}': {str(e)}")
+                    continue
+
                 if result:
                     logger.info(
                         f"Successfully geocoded '{location_clean}' using {geocoder_name} "
                         f"to: {result.get('name')} at ({result.get('latitude')}, {result.get('longitude')})"
                     )
+                    _geocode_cache.set(cache_key, result)
                     return result
-                
-            except Exception as e:
-                logger.warning(f"{geocoder_name} API failed for '{variation}': {str(e)}")
-                continue
+        finally:
+            # Stop any providers still queued once we have an answer
+            for future in futures:
+                future.cancel()
     
     # If all attempts failed
     error_msg = (
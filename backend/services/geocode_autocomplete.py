@@ -3,14 +3,38 @@ Autocomplete service for location search.
 Provides suggestions as user types, similar to Google Maps.
 Uses multiple APIs for best coverage.
 """
-import requests
+import orjson
 import logging
-import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 from urllib.parse import quote
 
+from services.cache import TTLCache, make_key
+from services.http import NOMINATIM_LIMITER, SESSION as _SESSION
+
 logger = logging.getLogger(__name__)
 
+# Providers are independent network calls - fan them out concurrently
+_autocomplete_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="autocomplete")
+
+# Separate pool for Google Place Details lookups so the per-prediction
+# fetches don't compete with the provider fan-out above
+_details_executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="place_details")
+
+# Keystroke queries repeat constantly across users - cache combined
+# suggestion lists for 24h (mirrored to Redis when configured)
+_autocomplete_cache = TTLCache("autocomplete", ttl=24 * 3600, maxsize=8192, use_redis=True)
+
+
+def _pick(d: Dict, *keys: str, default: str = "") -> str:
+    """First truthy value among d[keys] - one pass over the address dict."""
+    return next((d[k] for k in keys if d.get(k)), default)
+
+
+def _pack_coord_key(lat: float, lon: float) -> int:
+    """Pack a coordinate pair into one int on a milli-degree (~100m) grid."""
+    return (round(float(lat) * 1000) + 180_000) * 400_000 + (round(float(lon) * 1000) + 180_000)
+
 
 def autocomplete_openmeteo(query: str, limit: int = 5) -> List[Dict]:
     """
@@ -24,9 +48,9 @@ def autocomplete_openmeteo(query: str, limit: int = 5) -> List[Dict]:
             "language": "en"
         }
         
-        response = requests.get(url, params=params, timeout=5)
+        response = _SESSION.get(url, params=params, timeout=5)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         results = data.get("results", [])
         suggestions = []
@@ -78,12 +102,18 @@ def autocomplete_nominatim(query: str, limit: int = 5) -> List[Dict]:
             "q": query,
             "format": "json",
             "limit": limit,
-            "addressdetails": 1
+            "addressdetails": 1,
+            # Only the address block is used - skip the heavy extras
+            "extratags": 0,
+            "namedetails": 0,
+            "polygon_geojson": 0
         }
-        
-        response = requests.get(url, params=params, headers=headers, timeout=5)
+
+        # Respect rate limit without stalling after the response is in hand
+        NOMINATIM_LIMITER.wait()
+        response = _SESSION.get(url, params=params, headers=headers, timeout=5)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         suggestions = []
         
@@ -97,21 +127,52 @@ def autocomplete_nominatim(query: str, limit: int = 5) -> List[Dict]:
                 
                 suggestions.append({
                     "display_name": display_name,
-                    "name": address.get("city") or address.get("town") or address.get("village") or display_name.split(",")[0],
+                    "name": _pick(address, "city", "town", "village") or display_name.partition(",")[0],
                     "country": address.get("country") or address.get("country_code", "").upper(),
                     "latitude": float(lat),
                     "longitude": float(lon),
                     "source": "Nominatim"
                 })
-        
-        # Respect rate limit
-        time.sleep(0.5)
+
         return suggestions
     except Exception as e:
         logger.debug(f"Nominatim autocomplete failed: {str(e)}")
         return []
 
 
+def _google_place_details(place_id: str, description: str, api_key: str) -> Optional[Dict]:
+    """Resolve one Google place_id to a suggestion dict with coordinates."""
+    try:
+        details_url = "https://maps.googleapis.com/maps/api/place/details/json"
+        details_params = {
+            "place_id": place_id,
+            "key": api_key,
+            "fields": "geometry,formatted_address,name"
+        }
+
+        details_resp = _SESSION.get(details_url, params=details_params, timeout=5)
+        if details_resp.status_code == 200:
+            details_data = orjson.loads(details_resp.content)
+            if details_data.get("status") == "OK":
+                result = details_data.get("result", {})
+                geometry = result.get("geometry", {})
+                location = geometry.get("location", {})
+
+                if location.get("lat") and location.get("lng"):
+                    return {
+                        "display_name": description,
+                        "name": result.get("name") or description.partition(",")[0],
+                        "country": None,  # Extract from address if needed
+                        "latitude": float(location["lat"]),
+                        "longitude": float(location["lng"]),
+                        "source": "Google Maps"
+                    }
+    except Exception as e:
+        logger.debug(f"Google place details failed for {place_id}: {str(e)}")
+
+    return None
+
+
 def autocomplete_google_maps(query: str, api_key: Optional[str] = None, limit: int = 5) -> List[Dict]:
     """
     Get autocomplete suggestions from Google Maps Places API.
@@ -129,47 +190,35 @@ def autocomplete_google_maps(query: str, api_key: Optional[str] = None, limit: i
             "language": "en"
         }
         
-        response = requests.get(url, params=params, timeout=5)
+        response = _SESSION.get(url, params=params, timeout=5)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         if data.get("status") != "OK":
             logger.debug(f"Google Maps API status: {data.get('status')}")
             return []
         
         predictions = data.get("predictions", [])
+
+        # The details lookups are independent - fetch them concurrently
+        # instead of paying one sequential round-trip per prediction, and
+        # collect in submission order to preserve Google's ranking
+        futures = [
+            _details_executor.submit(
+                _google_place_details,
+                pred.get("place_id", ""),
+                pred.get("description", ""),
+                api_key,
+            )
+            for pred in predictions[:limit]
+        ]
+
         suggestions = []
-        
-        for pred in predictions[:limit]:
-            description = pred.get("description", "")
-            place_id = pred.get("place_id", "")
-            
-            # Get place details for coordinates
-            details_url = "https://maps.googleapis.com/maps/api/place/details/json"
-            details_params = {
-                "place_id": place_id,
-                "key": api_key,
-                "fields": "geometry,formatted_address,name"
-            }
-            
-            details_resp = requests.get(details_url, params=details_params, timeout=5)
-            if details_resp.status_code == 200:
-                details_data = details_resp.json()
-                if details_data.get("status") == "OK":
-                    result = details_data.get("result", {})
-                    geometry = result.get("geometry", {})
-                    location = geometry.get("location", {})
-                    
-                    if location.get("lat") and location.get("lng"):
-                        suggestions.append({
-                            "display_name": description,
-                            "name": result.get("name") or description.split(",")[0],
-                            "country": None,  # Extract from address if needed
-                            "latitude": float(location["lat"]),
-                            "longitude": float(location["lng"]),
-                            "source": "Google Maps"
-                        })
-        
+        for future in futures:
+            suggestion = future.result()
+            if suggestion:
+                suggestions.append(suggestion)
+
         return suggestions
     except Exception as e:
         logger.debug(f"Google Maps autocomplete failed: {str(e)}")
@@ -193,44 +242,64 @@ def get_autocomplete_suggestions(query: str, limit: int = 5, google_api_key: Opt
         return []
     
     query_clean = query.strip()
-    
-    # Collect suggestions from all APIs
-    all_suggestions = []
-    
-    # Try Open-Meteo first (fastest)
-    openmeteo_results = autocomplete_openmeteo(query_clean, limit=limit)
-    all_suggestions.extend(openmeteo_results)
-    
-    # Try Nominatim (most comprehensive)
-    if len(all_suggestions) < limit:
-        nominatim_results = autocomplete_nominatim(query_clean, limit=limit)
-        all_suggestions.extend(nominatim_results)
-    
-    # Try Google Maps if API key provided (best for addresses)
-    if google_api_key and len(all_suggestions) < limit:
-        google_results = autocomplete_google_maps(query_clean, google_api_key, limit=limit)
-        all_suggestions.extend(google_results)
-    
-    # Deduplicate based on coordinates (within 0.001 degrees ~100m)
-    unique_suggestions = []
+
+    cache_key = make_key(query_clean.lower(), limit, bool(google_api_key))
+    cached = _autocomplete_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Dispatch all providers at once and combine in preference order
+    # (Open-Meteo fastest, Nominatim most comprehensive, Google best for
+    # addresses) - total latency is the slowest provider, not the sum
+    futures = [
+        ("Open-Meteo", _autocomplete_executor.submit(autocomplete_openmeteo, query_clean, limit)),
+        ("Nominatim", _autocomplete_executor.submit(autocomplete_nominatim, query_clean, limit)),
+    ]
+    if google_api_key:
+        futures.append(
+            ("Google Maps", _autocomplete_executor.submit(autocomplete_google_maps, query_clean, google_api_key, limit))
+        )
+
+    # Consume providers in preference order and deduplicate inline
+    # (packed milli-degree keys, ~100m buckets). The moment `limit` unique
+    # suggestions exist the remaining providers are abandoned, so e.g. a
+    # full page from Open-Meteo means never waiting on Nominatim or Google
+    unique_suggestions: List[Dict] = []
     seen_coords = set()
-    
-    for suggestion in all_suggestions:
-        lat = suggestion.get("latitude")
-        lon = suggestion.get("longitude")
-        
-        if lat is None or lon is None:
-            continue
-        
-        # Round to 3 decimal places for deduplication (~100m precision)
-        coord_key = (round(float(lat), 3), round(float(lon), 3))
-        
-        if coord_key not in seen_coords:
-            seen_coords.add(coord_key)
-            unique_suggestions.append(suggestion)
-            
+
+    try:
+        for provider_name, future in futures:
             if len(unique_suggestions) >= limit:
                 break
-    
+            try:
+                results = future.result()
+            except Exception as e:
+                logger.debug(f"{provider_name} autocomplete failed: {str(e)}")
+                continue
+
+            for suggestion in results:
+                lat = suggestion.get("latitude")
+                lon = suggestion.get("longitude")
+
+                if lat is None or lon is None:
+                    continue
+
+                coord_key = _pack_coord_key(lat, lon)
+
+                if coord_key not in seen_coords:
+                    seen_coords.add(coord_key)
+                    unique_suggestions.append(suggestion)
+
+                    if len(unique_suggestions) >= limit:
+                        break
+    finally:
+        # Drop any providers still queued once we have a full page
+        for _, future in futures:
+            future.cancel()
+
+    # Only cache non-empty results so transient provider failures don't stick
+    if unique_suggestions:
+        _autocomplete_cache.set(cache_key, unique_suggestions)
+
     return unique_suggestions
 
@@ -0,0 +1,89 @@
+"""
+Shared pooled HTTP session for outbound service calls.
+One keep-alive connection pool across all providers avoids paying a TCP+TLS
+handshake per request to hosts we hit constantly (Nominatim, Open-Meteo,
+Google, GeoCode.xyz).
+"""
+import logging
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+SESSION = requests.Session()
+SESSION.headers["User-Agent"] = "AI-Weather-Predictor/1.0 (Educational Project)"
+# requests sends this by default, but pin it explicitly - the ~100KB hourly
+# payloads shrink several-fold under gzip and we never want a config change
+# to silently drop compression
+SESSION.headers["Accept-Encoding"] = "gzip, deflate"
+
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+# Optional persistent HTTP cache for the Open-Meteo weather calls - only used
+# if requests-cache is installed and HTTP_CACHE_PATH is set, mirroring the
+# optional Redis backend in services.cache. The hourly endpoints are
+# idempotent GETs (closed archive days are immutable), so a sqlite-backed
+# cache lets repeat responses survive process restarts and dev reloads.
+# Geocoding providers keep the plain session: their responses are small and
+# already cached post-parse.
+WEATHER_SESSION = SESSION
+_HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", None)
+
+if _HTTP_CACHE_PATH:
+    try:
+        import requests_cache
+
+        WEATHER_SESSION = requests_cache.CachedSession(
+            _HTTP_CACHE_PATH,
+            backend="sqlite",
+            expire_after=24 * 3600,
+            urls_expire_after={
+                # Archive days never change once closed; forecast model runs
+                # refresh a few times an hour
+                "*archive-api.open-meteo.com*": 7 * 24 * 3600,
+                "*api.open-meteo.com*": 15 * 60,
+            },
+        )
+        WEATHER_SESSION.headers.update(SESSION.headers)
+        logger.info(f"Weather HTTP cache using sqlite backend at {_HTTP_CACHE_PATH}")
+    except Exception as e:
+        logger.warning(f"requests-cache unavailable ({str(e)}), using plain session")
+        WEATHER_SESSION = SESSION
+
+
+class RateLimiter:
+    """
+    Minimum-interval limiter for rate-limited providers (e.g. Nominatim's
+    1 req/s policy). Blocks only when a call arrives before the interval
+    since the previous call has elapsed - a lone request pays zero wait,
+    unlike an unconditional sleep after every call.
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._last_call = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            delay = self._last_call + self.min_interval - now
+            if delay > 0:
+                time.sleep(delay)
+                now = time.monotonic()
+            self._last_call = now
+
+
+# One bucket shared by every Nominatim caller in the process
+NOMINATIM_LIMITER = RateLimiter(1.0)
@@ -0,0 +1,146 @@
+"""
+Local autocomplete short-circuit for well-known cities.
+A small in-memory prefix index over popular world cities answers the most
+common keystroke queries in microseconds with zero network I/O; anything it
+can't fill falls through to the HTTP providers.
+"""
+from typing import Dict, List
+
+# (name, admin1/state, country, latitude, longitude)
+POPULAR_CITIES = [
+    ("Mumbai", "Maharashtra", "India", 19.0760, 72.8777),
+    ("Delhi", "Delhi", "India", 28.7041, 77.1025),
+    ("Bangalore", "Karnataka", "India", 12.9716, 77.5946),
+    ("Hyderabad", "Telangana", "India", 17.3850, 78.4867),
+    ("Ahmedabad", "Gujarat", "India", 23.0225, 72.5714),
+    ("Chennai", "Tamil Nadu", "India", 13.0827, 80.2707),
+    ("Kolkata", "West Bengal", "India", 22.5726, 88.3639),
+    ("Pune", "Maharashtra", "India", 18.5204, 73.8567),
+    ("Jaipur", "Rajasthan", "India", 26.9124, 75.7873),
+    ("Lucknow", "Uttar Pradesh", "India", 26.8467, 80.9462),
+    ("Nagpur", "Maharashtra", "India", 21.1458, 79.0882),
+    ("Surat", "Gujarat", "India", 21.1702, 72.8311),
+    ("New York", "New York", "United States", 40.7128, -74.0060),
+    ("Los Angeles", "California", "United States", 34.0522, -118.2437),
+    ("Chicago", "Illinois", "United States", 41.8781, -87.6298),
+    ("Houston", "Texas", "United States", 29.7604, -95.3698),
+    ("Phoenix", "Arizona", "United States", 33.4484, -112.0740),
+    ("Philadelphia", "Pennsylvania", "United States", 39.9526, -75.1652),
+    ("San Francisco", "California", "United States", 37.7749, -122.4194),
+    ("Seattle", "Washington", "United States", 47.6062, -122.3321),
+    ("Boston", "Massachusetts", "United States", 42.3601, -71.0589),
+    ("Miami", "Florida", "United States", 25.7617, -80.1918),
+    ("Denver", "Colorado", "United States", 39.7392, -104.9903),
+    ("Austin", "Texas", "United States", 30.2672, -97.7431),
+    ("London", "England", "United Kingdom", 51.5074, -0.1278),
+    ("Manchester", "England", "United Kingdom", 53.4808, -2.2426),
+    ("Birmingham", "England", "United Kingdom", 52.4862, -1.8904),
+    ("Edinburgh", "Scotland", "United Kingdom", 55.9533, -3.1883),
+    ("Glasgow", "Scotland", "United Kingdom", 55.8642, -4.2518),
+    ("Paris", "Ile-de-France", "France", 48.8566, 2.3522),
+    ("Marseille", "Provence-Alpes-Cote d'Azur", "France", 43.2965, 5.3698),
+    ("Lyon", "Auvergne-Rhone-Alpes", "France", 45.7640, 4.8357),
+    ("Berlin", "Berlin", "Germany", 52.5200, 13.4050),
+    ("Munich", "Bavaria", "Germany", 48.1351, 11.5820),
+    ("Hamburg", "Hamburg", "Germany", 53.5511, 9.9937),
+    ("Frankfurt", "Hesse", "Germany", 50.1109, 8.6821),
+    ("Madrid", "Madrid", "Spain", 40.4168, -3.7038),
+    ("Barcelona", "Catalonia", "Spain", 41.3874, 2.1686),
+    ("Rome", "Lazio", "Italy", 41.9028, 12.4964),
+    ("Milan", "Lombardy", "Italy", 45.4642, 9.1900),
+    ("Naples", "Campania", "Italy", 40.8518, 14.2681),
+    ("Amsterdam", "North Holland", "Netherlands", 52.3676, 4.9041),
+    ("Brussels", "Brussels", "Belgium", 50.8503, 4.3517),
+    ("Vienna", "Vienna", "Austria", 48.2082, 16.3738),
+    ("Zurich", "Zurich", "Switzerland", 47.3769, 8.5417),
+    ("Geneva", "Geneva", "Switzerland", 46.2044, 6.1432),
+    ("Stockholm", "Stockholm", "Sweden", 59.3293, 18.0686),
+    ("Oslo", "Oslo", "Norway", 59.9139, 10.7522),
+    ("Copenhagen", "Capital Region", "Denmark", 55.6761, 12.5683),
+    ("Helsinki", "Uusimaa", "Finland", 60.1699, 24.9384),
+    ("Dublin", "Leinster", "Ireland", 53.3498, -6.2603),
+    ("Lisbon", "Lisbon", "Portugal", 38.7223, -9.1393),
+    ("Athens", "Attica", "Greece", 37.9838, 23.7275),
+    ("Warsaw", "Masovia", "Poland", 52.2297, 21.0122),
+    ("Prague", "Prague", "Czech Republic", 50.0755, 14.4378),
+    ("Budapest", "Budapest", "Hungary", 47.4979, 19.0402),
+    ("Moscow", "Moscow", "Russia", 55.7558, 37.6173),
+    ("Istanbul", "Istanbul", "Turkey", 41.0082, 28.9784),
+    ("Dubai", "Dubai", "United Arab Emirates", 25.2048, 55.2708),
+    ("Abu Dhabi", "Abu Dhabi", "United Arab Emirates", 24.4539, 54.3773),
+    ("Riyadh", "Riyadh", "Saudi Arabia", 24.7136, 46.6753),
+    ("Tel Aviv", "Tel Aviv", "Israel", 32.0853, 34.7818),
+    ("Cairo", "Cairo", "Egypt", 30.0444, 31.2357),
+    ("Lagos", "Lagos", "Nigeria", 6.5244, 3.3792),
+    ("Nairobi", "Nairobi", "Kenya", -1.2921, 36.8219),
+    ("Johannesburg", "Gauteng", "South Africa", -26.2041, 28.0473),
+    ("Cape Town", "Western Cape", "South Africa", -33.9249, 18.4241),
+    ("Tokyo", "Tokyo", "Japan", 35.6762, 139.6503),
+    ("Osaka", "Osaka", "Japan", 34.6937, 135.5023),
+    ("Seoul", "Seoul", "South Korea", 37.5665, 126.9780),
+    ("Beijing", "Beijing", "China", 39.9042, 116.4074),
+    ("Shanghai", "Shanghai", "China", 31.2304, 121.4737),
+    ("Shenzhen", "Guangdong", "China", 22.5431, 114.0579),
+    ("Hong Kong", "", "Hong Kong", 22.3193, 114.1694),
+    ("Singapore", "", "Singapore", 1.3521, 103.8198),
+    ("Bangkok", "Bangkok", "Thailand", 13.7563, 100.5018),
+    ("Jakarta", "Jakarta", "Indonesia", -6.2088, 106.8456),
+    ("Kuala Lumpur", "Kuala Lumpur", "Malaysia", 3.1390, 101.6869),
+    ("Manila", "Metro Manila", "Philippines", 14.5995, 120.9842),
+    ("Sydney", "New South Wales", "Australia", -33.8688, 151.2093),
+    ("Melbourne", "Victoria", "Australia", -37.8136, 144.9631),
+    ("Brisbane", "Queensland", "Australia", -27.4698, 153.0251),
+    ("Perth", "Western Australia", "Australia", -31.9505, 115.8605),
+    ("Auckland", "Auckland", "New Zealand", -36.8485, 174.7633),
+    ("Toronto", "Ontario", "Canada", 43.6532, -79.3832),
+    ("Vancouver", "British Columbia", "Canada", 49.2827, -123.1207),
+    ("Montreal", "Quebec", "Canada", 45.5017, -73.5673),
+    ("Mexico City", "Mexico City", "Mexico", 19.4326, -99.1332),
+    ("Sao Paulo", "Sao Paulo", "Brazil", -23.5505, -46.6333),
+    ("Rio de Janeiro", "Rio de Janeiro", "Brazil", -22.9068, -43.1729),
+    ("Buenos Aires", "Buenos Aires", "Argentina", -34.6037, -58.3816),
+    ("Santiago", "Santiago", "Chile", -33.4489, -70.6693),
+    ("Lima", "Lima", "Peru", -12.0464, -77.0428),
+    ("Bogota", "Bogota", "Colombia", 4.7110, -74.0721),
+]
+
+# Prefix index built once at import: every name prefix (2+ chars) maps to the
+# list of matching suggestion dicts, so lookups are a single dict hit
+_prefix_index: Dict[str, List[Dict]] = {}
+
+
+def _build_index() -> None:
+    for name, admin1, country, lat, lon in POPULAR_CITIES:
+        parts = [name]
+        if admin1:
+            parts.append(admin1)
+        if country:
+            parts.append(country)
+
+        suggestion = {
+            "display_name": ", ".join(parts),
+            "name": name,
+            "country": country,
+            "latitude": lat,
+            "longitude": lon,
+            "source": "Local"
+        }
+
+        lowered = name.lower()
+        for end in range(2, len(lowered) + 1):
+            _prefix_index.setdefault(lowered[:end], []).append(suggestion)
+
+
+_build_index()
+
+
+def search_popular_cities(query: str, limit: int = 8) -> List[Dict]:
+    """
+    Return suggestions for popular cities whose name starts with `query`.
+    Same dict shape as the HTTP autocomplete providers.
+    """
+    if not query or len(query) < 2:
+        return []
+
+    matches = _prefix_index.get(query.strip().lower(), [])
+    return matches[:limit]
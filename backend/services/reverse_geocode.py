@@ -2,13 +2,29 @@
 Reverse geocoding service - converts coordinates to location name.
 Uses multiple APIs with fallbacks.
 """
-import requests
+import orjson
 import logging
-import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
 
+from services.cache import TTLCache, make_key
+from services.http import NOMINATIM_LIMITER, SESSION as _SESSION
+
 logger = logging.getLogger(__name__)
 
+# Providers run concurrently; results are still taken in priority order
+_reverse_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="reverse_geocode")
+
+# Coordinates cluster: map-click requests land within ~100m of each other,
+# so round keys to 3 decimals and cache for 48h to convert near-duplicate
+# lookups into hits
+_reverse_cache = TTLCache("reverse_geocode", ttl=48 * 3600, maxsize=4096, use_redis=True)
+
+
+def _pick(d: Dict, *keys: str, default: str = "") -> str:
+    """Return the first truthy value among d[keys], scanning the dict once."""
+    return next((d[k] for k in keys if d.get(k)), default)
+
 
 def reverse_geocode_nominatim(lat: float, lon: float) -> Optional[Dict]:
     """
@@ -25,25 +41,25 @@ def reverse_geocode_nominatim(lat: float, lon: float) -> Optional[Dict]:
             "lat": str(lat),
             "lon": str(lon),
             "format": "json",
-            "addressdetails": 1
+            "addressdetails": 1,
+            # Only the address block is used - skip the heavy extras
+            "extratags": 0,
+            "namedetails": 0,
+            "polygon_geojson": 0
         }
-        
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+
+        # Respect rate limit without stalling after the response is in hand
+        NOMINATIM_LIMITER.wait()
+        response = _SESSION.get(url, params=params, headers=headers, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         if data and data.get("address"):
             address = data.get("address", {})
             display_name = data.get("display_name", "")
             
             # Extract key components
-            city = (
-                address.get("city") or 
-                address.get("town") or 
-                address.get("village") or 
-                address.get("suburb") or
-                ""
-            )
+            city = _pick(address, "city", "town", "village", "suburb")
             country = address.get("country", "")
             state = address.get("state", "")
             
@@ -66,8 +82,6 @@ def reverse_geocode_nominatim(lat: float, lon: float) -> Optional[Dict]:
                 "latitude": lat,
                 "longitude": lon
             }
-        
-        time.sleep(1)  # Rate limit
     except Exception as e:
         logger.debug(f"Nominatim reverse geocoding failed: {str(e)}")
     
@@ -88,9 +102,9 @@ def reverse_geocode_openmeteo(lat: float, lon: float) -> Optional[Dict]:
             "count": 1
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = _SESSION.get(url, params=params, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         results = data.get("results", [])
         if results:
@@ -124,9 +138,9 @@ def reverse_geocode_google_maps(lat: float, lon: float, api_key: Optional[str] =
             "key": api_key
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = _SESSION.get(url, params=params, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         if data.get("status") == "OK" and data.get("results"):
             result = data["results"][0]
@@ -156,6 +170,17 @@ def reverse_geocode_google_maps(lat: float, lon: float, api_key: Optional[str] =
     return None
 
 
+# Provider orderings built once at import time; reverse_geocode just picks
+# one instead of assembling a fresh list of closures on every call.
+# Nominatim first, Open-Meteo as fallback (limited but fast); Google Maps
+# leads when an API key is supplied.
+_PROVIDERS_NO_GOOGLE = (
+    ("Nominatim", reverse_geocode_nominatim),
+    ("Open-Meteo", reverse_geocode_openmeteo),
+)
+_PROVIDERS_WITH_GOOGLE = (("Google Maps", reverse_geocode_google_maps),) + _PROVIDERS_NO_GOOGLE
+
+
 def reverse_geocode(lat: float, lon: float, google_api_key: Optional[str] = None) -> Dict[str, any]:
     """
     Reverse geocode coordinates to get location name.
@@ -169,26 +194,39 @@ def reverse_geocode(lat: float, lon: float, google_api_key: Optional[str] = None
     Returns:
         Dictionary with location name and metadata
     """
-    geocoders = [
-        ("Nominatim", lambda: reverse_geocode_nominatim(lat, lon)),
+    cache_key = make_key(round(lat, 3), round(lon, 3), bool(google_api_key))
+    cached = _reverse_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Reverse geocode cache hit for ({lat}, {lon})")
+        return cached
+
+    providers = _PROVIDERS_WITH_GOOGLE if google_api_key else _PROVIDERS_NO_GOOGLE
+
+    # Launch every provider at once, then take results in priority order -
+    # the fallbacks are already in flight if the preferred one misses
+    futures = [
+        (name,
+         _reverse_executor.submit(func, lat, lon, google_api_key)
+         if func is reverse_geocode_google_maps
+         else _reverse_executor.submit(func, lat, lon))
+        for name, func in providers
     ]
-    
-    # Add Google Maps if API key provided
-    if google_api_key:
-        geocoders.insert(0, ("Google Maps", lambda: reverse_geocode_google_maps(lat, lon, google_api_key)))
-    
-    # Try Open-Meteo as fallback (limited but fast)
-    geocoders.append(("Open-Meteo", lambda: reverse_geocode_openmeteo(lat, lon)))
-    
-    for geocoder_name, geocoder_func in geocoders:
-        try:
-            result = geocoder_func()
+
+    try:
+        for geocoder_name, future in futures:
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.warning(f"{geocoder_name} reverse geocoding failed: {str(e)}")
+                continue
+
             if result:
                 logger.info(f"Successfully reverse geocoded ({lat}, {lon}) using {geocoder_name}")
+                _reverse_cache.set(cache_key, result)
                 return result
-        except Exception as e:
-            logger.warning(f"{geocoder_name} reverse geocoding failed: {str(e)}")
-            continue
+    finally:
+        for _, future in futures:
+            future.cancel()
     
     # Fallback - return coordinates as name
     return {
@@ -2,20 +2,197 @@
 Weather data fetching service using Open-Meteo APIs.
 Fetches historical, current, and forecast weather/solar data.
 """
+import numpy as np
+import orjson
 import pandas as pd
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta, timezone
 from typing import Dict, Optional
 
+from services.cache import TTLCache, make_key
+from services.http import WEATHER_SESSION as _SESSION
+
 logger = logging.getLogger(__name__)
 
+# Closed historical days are immutable and forecast model runs refresh a few
+# times an hour, so repeat requests for the same rounded coordinate can skip
+# the network. DataFrames aren't JSON-serializable, so these stay in-process
+# only.
+_historical_cache = TTLCache("weather_historical", ttl=24 * 3600, maxsize=512)
+_forecast_cache = TTLCache("weather_forecast", ttl=1800, maxsize=512)
+
+# Pool for racing the narrower fallback variable sets after the widest fails
+_weather_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="weather")
+
+# All weather columns a result frame carries, in output order
+_WEATHER_COLUMNS = (
+    "temperature_2m",
+    "relativehumidity_2m",
+    "shortwave_radiation",
+    "cloudcover",
+    "precipitation",
+    "pressure_msl",
+    "wind_speed_10m",
+)
+
+# Variable sets tried widest-first - some locations lack the rarer variables
+_VARIABLE_SETS = (
+    "temperature_2m,relativehumidity_2m,shortwave_radiation,cloudcover,precipitation,pressure_msl,wind_speed_10m",
+    "temperature_2m,relativehumidity_2m,shortwave_radiation,cloudcover,precipitation,pressure_msl",
+    "temperature_2m,relativehumidity_2m,shortwave_radiation,cloudcover",
+    "temperature_2m,relativehumidity_2m",
+)
+
+# Template for the all-attempts-failed return; copied per call so callers
+# never mutate the shared instance
+_EMPTY_FRAME = pd.DataFrame(columns=("time",) + _WEATHER_COLUMNS)
+
+# Some regions persistently reject the wider variable sets; remember which
+# set last worked per rounded coordinate so repeat requests skip straight to
+# it instead of burning a failed round trip each time. The 24h TTL doubles
+# as the recovery probe: once an entry expires the widest set is tried
+# again, picking up any newly available variables.
+_varset_cache = TTLCache("weather_varset", ttl=24 * 3600, maxsize=2048)
+
+
+def _fetch_hourly_frame(url: str, params: Dict, api_name: str) -> Optional[pd.DataFrame]:
+    """
+    One attempt against an Open-Meteo hourly endpoint. Returns the built
+    DataFrame, or None if the request failed or the response was unusable.
+    """
+    try:
+        response = _SESSION.get(url, params=params, timeout=30)
+
+        if response.status_code != 200:
+            error_text = response.text[:200] if hasattr(response, 'text') else str(response.status_code)
+            logger.warning(f"{api_name} API returned status {response.status_code}: {error_text}")
+            return None
+
+        # Decode the raw bytes with orjson - the hourly payloads are ~100KB
+        # of numbers where the stdlib parser is the bottleneck
+        data = orjson.loads(response.content)
+
+        # Check if we got an error in the response
+        if "error" in data or "reason" in data:
+            logger.warning(f"{api_name} API returned error: {data.get('reason', 'Unknown error')}")
+            return None
+
+        if "hourly" not in data:
+            logger.warning(f"No hourly data in {api_name} API response")
+            return None
+
+        hourly = data["hourly"]
+        if not hourly.get("time"):
+            logger.warning(f"Empty time array in {api_name} hourly data")
+            return None
+
+        # Open-Meteo timestamps use a fixed minute-resolution ISO layout;
+        # naming the format takes pandas' fast C parsing path instead of
+        # inspecting every string. Fall back to inference just in case a
+        # response ever carries seconds.
+        try:
+            times = pd.to_datetime(hourly["time"], format="%Y-%m-%dT%H:%M", utc=True, cache=True)
+        except (ValueError, TypeError):
+            times = pd.to_datetime(hourly["time"], utc=True)
+
+        # Build DataFrame with available columns
+        df_dict = {"time": times}
+
+        # Build every column as a typed float array up front - API nulls
+        # become NaN during the cast and missing variables become NaN
+        # arrays, so pandas never has to type-infer [None]*n object lists
+        n = len(hourly["time"])
+        for col_name in _WEATHER_COLUMNS:
+            vals = hourly.get(col_name)
+            df_dict[col_name] = (
+                np.asarray(vals, dtype=np.float64)
+                if vals is not None
+                else np.full(n, np.nan)
+            )
+
+        df = pd.DataFrame(df_dict, copy=False)
+
+        # Open-Meteo returns clean, strictly ascending timestamps; only pay
+        # for the dropna/sort when a response actually violates that
+        time_col = df["time"]
+        if time_col.isna().any():
+            df = df.dropna(subset=["time"])
+            time_col = df["time"]
+
+        if df.empty:
+            logger.warning(f"{api_name} DataFrame is empty after processing")
+            return None
+
+        if not time_col.is_monotonic_increasing:
+            df = df.sort_values("time").reset_index(drop=True)
+
+        return df
+
+    except requests.exceptions.Timeout:
+        logger.warning(f"{api_name} API request timed out")
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"{api_name} API request failed: {str(e)}")
+    except Exception as e:
+        logger.warning(f"Error processing {api_name} API response: {str(e)}")
+
+    return None
+
+
+def _fetch_with_fallbacks(url: str, base_params: Dict, variable_sets: tuple,
+                          api_name: str, region_key: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    Try the widest variable set first; if it fails, race the narrower
+    fallbacks concurrently and take the widest that succeeds. Worst-case
+    latency is one timeout plus the slowest fallback, not one timeout per
+    sequential retry. When `region_key` is given and _varset_cache knows
+    which set last worked there, start directly at that set.
+    """
+    def attempt(variables: str) -> Optional[pd.DataFrame]:
+        return _fetch_hourly_frame(url, {**base_params, "hourly": variables}, api_name)
+
+    cache_key = make_key(api_name, region_key) if region_key else None
+    start = _varset_cache.get(cache_key) if cache_key else None
+    if not isinstance(start, int) or not 0 <= start < len(variable_sets):
+        start = 0
+
+    logger.info(f"Fetching {api_name} data with variables: {variable_sets[start].split(',')[:3]}...")
+    df = attempt(variable_sets[start])
+    if df is not None:
+        if cache_key and start:
+            # Refresh the entry so an actively queried region keeps skipping
+            # the known-failing wider sets
+            _varset_cache.set(cache_key, start)
+        return df
+
+    futures = [(i, _weather_executor.submit(attempt, variable_sets[i]))
+               for i in range(start + 1, len(variable_sets))]
+
+    try:
+        for i, future in futures:
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.warning(f"{api_name} fallback fetch failed: {str(e)}")
+                continue
+
+            if result is not None:
+                if cache_key:
+                    _varset_cache.set(cache_key, i)
+                return result
+    finally:
+        for _, future in futures:
+            future.cancel()
+
+    return None
+
 
 def fetch_historical(lat: float, lon: float, days: int = 60) -> pd.DataFrame:
     """
     Fetch last `days` of hourly historical data for the exact coordinate.
     Uses Open-Meteo Archive API with fallback mechanisms.
-    
+
     Note: Archive API has a data delay (usually 2-7 days), so we request
     data up to 3 days ago to ensure availability.
 
@@ -33,115 +210,43 @@ def fetch_historical(lat: float, lon: float, days: int = 60) -> pd.DataFrame:
     # Archive API has a delay - request data up to 3 days ago to ensure availability
     end_date = date.today() - timedelta(days=3)
     start_date = end_date - timedelta(days=days)
-    
+
+    # end_date in the key rolls the cache over when a new archive day closes
+    cache_key = make_key(round(lat, 3), round(lon, 3), days, end_date.isoformat())
+    cached = _historical_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Historical cache hit for ({lat}, {lon}, {days}d)")
+        return cached.copy()
+
     # Ensure we don't request dates too far in the past (archive might not have data)
     # Archive typically goes back many years, but let's be safe
     min_date = date(2020, 1, 1)
     if start_date < min_date:
         logger.warning(f"Requested start date {start_date} is before {min_date}, adjusting to {min_date}")
         start_date = min_date
-    
+
     url = "https://archive-api.open-meteo.com/v1/archive"
-    
-    # Try different variable sets - some locations might not have all variables
-    variable_sets = [
-        "temperature_2m,relativehumidity_2m,shortwave_radiation,cloudcover,precipitation,pressure_msl,wind_speed_10m",
-        "temperature_2m,relativehumidity_2m,shortwave_radiation,cloudcover,precipitation,pressure_msl",
-        "temperature_2m,relativehumidity_2m,shortwave_radiation,cloudcover",
-        "temperature_2m,relativehumidity_2m",
-    ]
-    
-    last_error = None
-    for variables in variable_sets:
-        params = {
-            "latitude": lat,
-            "longitude": lon,
-            "start_date": start_date.isoformat(),
-            "end_date": end_date.isoformat(),
-            "hourly": variables,
-            "timezone": "UTC"
-        }
-        
-        try:
-            logger.info(f"Fetching historical data from {start_date} to {end_date} with variables: {variables.split(',')[:3]}...")
-            response = requests.get(url, params=params, timeout=30)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Check if we got an error in the response
-                if "error" in data or "reason" in data:
-                    error_msg = data.get("reason", "Unknown error")
-                    logger.warning(f"API returned error: {error_msg}")
-                    last_error = error_msg
-                    continue
-                
-                if "hourly" not in data:
-                    logger.warning("No hourly data in API response")
-                    continue
-                
-                hourly = data["hourly"]
-                if not hourly.get("time"):
-                    logger.warning("Empty time array in hourly data")
-                    continue
-                
-                # Build DataFrame with available columns
-                df_dict = {"time": pd.to_datetime(hourly["time"], utc=True)}
-                
-                # Map all possible columns
-                column_map = {
-                    "temperature_2m": "temperature_2m",
-                    "relativehumidity_2m": "relativehumidity_2m",
-                    "shortwave_radiation": "shortwave_radiation",
-                    "cloudcover": "cloudcover",
-                    "precipitation": "precipitation",
-                    "pressure_msl": "pressure_msl",
-                    "wind_speed_10m": "wind_speed_10m",
-                }
-                
-                for col_name in column_map.values():
-                    if col_name in hourly:
-                        df_dict[col_name] = hourly.get(col_name, [None] * len(hourly["time"]))
-                    else:
-                        # Fill with None if column not available
-                        df_dict[col_name] = [None] * len(hourly["time"])
-                
-                df = pd.DataFrame(df_dict)
-                
-                # Drop rows where time is missing
-                df = df.dropna(subset=["time"])
-                
-                if df.empty:
-                    logger.warning("DataFrame is empty after processing")
-                    continue
-                
-                df = df.sort_values("time").reset_index(drop=True)
-                logger.info(f"Successfully fetched {len(df)} historical data points")
-                return df
-                
-            else:
-                error_text = response.text[:200] if hasattr(response, 'text') else str(response.status_code)
-                logger.warning(f"Archive API returned status {response.status_code}: {error_text}")
-                last_error = f"Status {response.status_code}: {error_text}"
-                continue
-                
-        except requests.exceptions.Timeout:
-            logger.warning("Archive API request timed out")
-            last_error = "Request timeout"
-            continue
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Archive API request failed: {str(e)}")
-            last_error = str(e)
-            continue
-        except Exception as e:
-            logger.warning(f"Error processing archive API response: {str(e)}")
-            last_error = str(e)
-            continue
-    
+
+    base_params = {
+        "latitude": lat,
+        "longitude": lon,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "timezone": "UTC"
+    }
+
+    # Variable availability is a property of the model grid, so a coarser
+    # rounding than the data cache is fine and raises the hit rate
+    df = _fetch_with_fallbacks(url, base_params, _VARIABLE_SETS, "Archive",
+                               region_key=make_key(round(lat, 2), round(lon, 2)))
+    if df is not None:
+        logger.info(f"Successfully fetched {len(df)} historical data points")
+        _historical_cache.set(cache_key, df)
+        return df
+
     # If all attempts failed, return empty DataFrame with correct structure
-    logger.error(f"Failed to fetch historical data after all attempts. Last error: {last_error}")
-    return pd.DataFrame(columns=["time", "temperature_2m", "relativehumidity_2m", "shortwave_radiation",
-                                 "cloudcover", "precipitation", "pressure_msl", "wind_speed_10m"])
+    logger.error("Failed to fetch historical data after all attempts")
+    return _EMPTY_FRAME.copy()
 
 
 def fetch_forecast(lat: float, lon: float, days: int = 7) -> pd.DataFrame:
@@ -156,86 +261,35 @@ def fetch_forecast(lat: float, lon: float, days: int = 7) -> pd.DataFrame:
     Returns:
         DataFrame with same structure as historical data
     """
+    cache_key = make_key(round(lat, 3), round(lon, 3), days)
+    cached = _forecast_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Forecast cache hit for ({lat}, {lon}, {days}d)")
+        return cached.copy()
+
     url = "https://api.open-meteo.com/v1/forecast"
-    
-    # Try different variable sets
-    variable_sets = [
-        "temperature_2m,relativehumidity_2m,shortwave_radiation,cloudcover,precipitation,pressure_msl,wind_speed_10m",
-        "temperature_2m,relativehumidity_2m,shortwave_radiation,cloudcover,precipitation,pressure_msl",
-        "temperature_2m,relativehumidity_2m,shortwave_radiation,cloudcover",
-        "temperature_2m,relativehumidity_2m",
-    ]
-    
-    for variables in variable_sets:
-        params = {
-            "latitude": lat,
-            "longitude": lon,
-            "hourly": variables,
-            "forecast_days": min(days, 14),  # API limit
-            "timezone": "UTC"
-        }
-        
-        try:
-            logger.info(f"Fetching forecast data with variables: {variables.split(',')[:3]}...")
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            
-            if "error" in data or "reason" in data:
-                error_msg = data.get("reason", "Unknown error")
-                logger.warning(f"Forecast API returned error: {error_msg}")
-                continue
-            
-            if "hourly" not in data:
-                logger.warning("No hourly data in forecast API response")
-                continue
-            
-            hourly = data["hourly"]
-            if not hourly.get("time"):
-                logger.warning("Empty time array in forecast hourly data")
-                continue
-            
-            # Build DataFrame with available columns
-            df_dict = {"time": pd.to_datetime(hourly["time"], utc=True)}
-            
-            column_map = {
-                "temperature_2m": "temperature_2m",
-                "relativehumidity_2m": "relativehumidity_2m",
-                "shortwave_radiation": "shortwave_radiation",
-                "cloudcover": "cloudcover",
-                "precipitation": "precipitation",
-                "pressure_msl": "pressure_msl",
-                "wind_speed_10m": "wind_speed_10m",
-            }
-            
-            for col_name in column_map.values():
-                if col_name in hourly:
-                    df_dict[col_name] = hourly.get(col_name, [None] * len(hourly["time"]))
-                else:
-                    df_dict[col_name] = [None] * len(hourly["time"])
-            
-            df = pd.DataFrame(df_dict)
-            df = df.dropna(subset=["time"])
-            
-            if df.empty:
-                logger.warning("Forecast DataFrame is empty")
-                continue
-            
-            df = df.sort_values("time").reset_index(drop=True)
-            logger.info(f"Successfully fetched {len(df)} forecast data points")
-            return df
-            
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Forecast API request failed with {variables}: {str(e)}")
-            continue
-        except Exception as e:
-            logger.warning(f"Error processing forecast API response: {str(e)}")
-            continue
-    
+
+    base_params = {
+        "latitude": lat,
+        "longitude": lon,
+        "forecast_days": min(days, 14),  # API limit
+        "timezone": "UTC"
+    }
+
+    df = _fetch_with_fallbacks(url, base_params, _VARIABLE_SETS, "Forecast",
+                               region_key=make_key(round(lat, 2), round(lon, 2)))
+    if df is not None:
+        logger.info(f"Successfully fetched {len(df)} forecast data points")
+        # Index the frame by its (already sorted) timestamps once at ingest;
+        # nearest-time lookups downstream then binary-search the index
+        # instead of scanning the time column, and every cache hit reuses it
+        df.index = pd.DatetimeIndex(df["time"].array)
+        _forecast_cache.set(cache_key, df)
+        return df
+
     # Return empty DataFrame if all attempts failed
     logger.error("Failed to fetch forecast data after all attempts")
-    return pd.DataFrame(columns=["time", "temperature_2m", "relativehumidity_2m", "shortwave_radiation",
-                                 "cloudcover", "precipitation", "pressure_msl", "wind_speed_10m"])
+    return _EMPTY_FRAME.copy()
 
 
 def extract_current_from_forecast(forecast_df: pd.DataFrame) -> Dict[str, float]:
@@ -252,20 +306,27 @@ def extract_current_from_forecast(forecast_df: pd.DataFrame) -> Dict[str, float]
     if forecast_df.empty:
         return {}
 
-    now = datetime.now(timezone.utc)
-    forecast_df = forecast_df.copy()
-    forecast_df["time_diff"] = (forecast_df["time"] - now).abs()
-    closest_row = forecast_df.loc[forecast_df["time_diff"].idxmin()]
-
-    current = {
-        "temperature_2m": float(closest_row.get("temperature_2m", 0)) if pd.notna(closest_row.get("temperature_2m")) else None,
-        "relativehumidity_2m": float(closest_row.get("relativehumidity_2m", 0)) if pd.notna(closest_row.get("relativehumidity_2m")) else None,
-        "shortwave_radiation": float(closest_row.get("shortwave_radiation", 0)) if pd.notna(closest_row.get("shortwave_radiation")) else None,
-        "cloudcover": float(closest_row.get("cloudcover", 0)) if pd.notna(closest_row.get("cloudcover")) else None,
-        "precipitation": float(closest_row.get("precipitation", 0)) if pd.notna(closest_row.get("precipitation")) else None,
-        "pressure_msl": float(closest_row.get("pressure_msl", 0)) if pd.notna(closest_row.get("pressure_msl")) else None,
-        "wind_speed_10m": float(closest_row.get("wind_speed_10m", 0)) if pd.notna(closest_row.get("wind_speed_10m")) else None,
-    }
+    now = pd.Timestamp.now(tz=timezone.utc)
+    time_index = forecast_df.index
+
+    if isinstance(time_index, pd.DatetimeIndex) and time_index.is_monotonic_increasing:
+        # Frames from fetch_forecast carry a sorted DatetimeIndex - binary
+        # search for the row closest to now
+        idx = int(time_index.get_indexer([now], method="nearest")[0])
+    else:
+        # Plain frames: one vectorized argmin over the int64-nanosecond view
+        # of the time column - no frame copy, no helper column
+        times_ns = forecast_df["time"].to_numpy(dtype="datetime64[ns]").view("i8")
+        idx = int(np.abs(times_ns - now.value).argmin())
+
+    # One to_dict() call replaces per-column Series lookups and pd.notna
+    # dispatch with plain dict/float operations
+    row = forecast_df.iloc[idx].to_dict()
+
+    current = {}
+    for col in _WEATHER_COLUMNS:
+        val = row.get(col)
+        if val is not None and val == val:  # NaN test without pandas overhead
+            current[col] = float(val)
 
-    # Remove None values
-    return {k: v for k, v in current.items() if v is not None}
+    return current